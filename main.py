@@ -8,6 +8,12 @@ from pathlib import Path
 from colorama import init
 import signal
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (and unavailable on Windows); fall back to the default loop
+    uvloop = None
+
 from src.core.config import config
 from src.utils.config_manager import config_manager
 from src.processing.zscore_processor import ZScoreProcessor
@@ -29,6 +35,10 @@ def parse_arguments():
     parser.add_argument('--zscore_trend_thresh', type=float, default=None, help='Z-score trend threshold for alerts')
     parser.add_argument('--use_multiprocessing', action='store_true', help='Enable multiprocessing for data processing')
     parser.add_argument('--num_processes', type=int, default=8, help='Number of processes to use when multiprocessing is enabled')
+    parser.add_argument('--flush_interval', type=float, default=0.0,
+                        help='Seconds to batch ticks per symbol before processing (default: 0, process every tick)')
+    parser.add_argument('--process_pool', action='store_true',
+                        help='Use a process pool instead of threads when multiprocessing is enabled')
     return parser.parse_args()
 
 def setup_logging(debug=False):
@@ -80,8 +90,9 @@ async def main():
     processor = ZScoreProcessor()
     parallel_processor = None
     if args.use_multiprocessing:
-        parallel_processor = ParallelProcessor(args.num_processes, processor)
-        logging.info(f"Multiprocessing enabled with {args.num_processes} processes")
+        parallel_processor = ParallelProcessor(args.num_processes, processor, use_processes=args.process_pool)
+        logging.info(f"Multiprocessing enabled with {args.num_processes} "
+                     f"{'processes' if args.process_pool else 'threads'}")
     
     manager = DataStreamManager(
         symbols=symbols,
@@ -91,7 +102,8 @@ async def main():
         calculate_start_date=calculate_start_date,
         test_mode=args.test,
         days_ago=args.days_ago,
-        stream_type=args.stream_type
+        stream_type=args.stream_type,
+        flush_interval=args.flush_interval
     )
 
     config_path = config_manager.config_file
@@ -127,6 +139,9 @@ async def main():
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        if uvloop is not None:
+            uvloop.run(main())
+        else:
+            asyncio.run(main())
     except KeyboardInterrupt:
         logging.info("Program interrupted by user.")
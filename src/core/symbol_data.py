@@ -1,22 +1,84 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, InitVar
+from typing import Optional
 import numpy as np
-import pandas as pd
+
+MIN_CAPACITY = 64
+# Minute-bar prices carry ~4 significant decimals, well within float32
+PRICE_DTYPE = np.float32
 
 @dataclass
 class SymbolData:
     symbol: str
-    historical_data: pd.DataFrame
+    # Bar times, only held until SymbolDataManager has located the baseline day
+    timestamps: Optional[np.ndarray] = field(default=None, repr=False)
+    closes: InitVar[np.ndarray] = None
     baseline_prices: np.ndarray = None
     baseline_mean: float = 0.0
     baseline_std: float = 1.0
-    full_prices: np.ndarray = None
     timeframe: str = "1Min"
+    _buf: np.ndarray = field(default=None, init=False, repr=False)
+    _length: int = field(default=0, init=False, repr=False)
+    _capacity: int = field(default=0, init=False, repr=False)
+    # Per-symbol HP filter state kept by ZScoreProcessor; reset whenever the stored prices change
+    hp_state: dict = field(default=None, init=False, repr=False)
+
+    def __post_init__(self, closes):
+        if closes is not None:
+            self.full_prices = closes
+
+    @property
+    def full_prices(self) -> np.ndarray:
+        return self._buf[:self._length]
+
+    @full_prices.setter
+    def full_prices(self, prices: np.ndarray):
+        prices = np.asarray(prices, dtype=PRICE_DTYPE)
+        self._length = len(prices)
+        self._capacity = max(2 * self._length, MIN_CAPACITY)
+        self._buf = np.empty(self._capacity, dtype=PRICE_DTYPE)
+        self._buf[:self._length] = prices
+        self.hp_state = None
+
+    def attach_buffer(self, buf: np.ndarray, length: int):
+        """
+        Use `buf` (e.g. a row of a shared-memory array) as the price storage
+        without copying. The first `length` entries are the stored prices; the
+        rest is spare capacity.
+        """
+        self._buf = buf
+        self._length = length
+        self._capacity = len(buf)
+        self.hp_state = None
+
+    def prices_view(self) -> np.ndarray:
+        """Zero-copy view of the stored prices."""
+        return self._buf[:self._length]
+
+    def prices_with(self, price: float) -> np.ndarray:
+        """
+        Zero-copy view of the stored prices followed by `price`.
 
-    def __post_init__(self):
-        if self.full_prices is None:
-            self.full_prices = self.historical_data['close'].values
+        The price is written into the spare slot past the end of the buffer
+        without being committed, so the view is only valid until the next
+        call to `prices_with` or `append_price`.
+        """
+        self._reserve(self._length + 1)
+        self._buf[self._length] = price
+        return self._buf[:self._length + 1]
 
     def append_price(self, price: float):
-        self.full_prices = np.append(self.full_prices, price)
+        self._reserve(self._length + 1)
+        self._buf[self._length] = price
+        self._length += 1
 
+    def set_baseline(self, prices: np.ndarray):
+        """Store the baseline prices and their mean/std."""
+        self.baseline_prices = np.asarray(prices, dtype=PRICE_DTYPE)
+        # Accumulate in float64; only the published values are float32
+        self.baseline_mean = PRICE_DTYPE(self.baseline_prices.mean(dtype=np.float64))
+        self.baseline_std = PRICE_DTYPE(self.baseline_prices.std(dtype=np.float64))
 
+    def _reserve(self, size: int):
+        if size > self._capacity:
+            self._capacity = max(2 * self._capacity, size, MIN_CAPACITY)
+            self._buf = np.resize(self._buf, self._capacity)
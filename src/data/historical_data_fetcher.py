@@ -1,29 +1,93 @@
 import logging
 import aiohttp
 import asyncio
-import pandas as pd
+import orjson
+import numpy as np
 from typing import Set
 from datetime import datetime
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from ..core.symbol_data import PRICE_DTYPE
 
 class HistoricalDataFetcher:
-    def __init__(self, api_key: str, api_secret: str, base_url: str):
+    def __init__(self, api_key: str, api_secret: str, base_url: str, max_concurrency: int = 256):
         self.api_key = api_key
         self.api_secret = api_secret
         self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self._session = None
+        # Cleared while the API is rate limiting us; every worker waits on it
+        self._resume = asyncio.Event()
+        self._resume.set()
+
+    async def __aenter__(self):
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        # One long-lived session so connections (and DNS lookups) are reused
+        # across symbols and batches; concurrency is bounded by the number of
+        # fetch workers rather than the connector limit.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=0, ttl_dns_cache=300, keepalive_timeout=75,
+                                             enable_cleanup_closed=True)
+            headers = {"APCA-API-KEY-ID": self.api_key, "APCA-API-SECRET-KEY": self.api_secret}
+            self._session = aiohttp.ClientSession(connector=connector, headers=headers)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
 
     async def fetch_historical_data(self, symbols: Set[str], start_date: datetime, end_date: datetime):
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.fetch_symbol_data(session, symbol, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')) for symbol in symbols]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            return [result for result in results if not isinstance(result, Exception)]
+        session = await self._get_session()
+        start, end = start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+        queue = asyncio.Queue()
+        for symbol in symbols:
+            queue.put_nowait(symbol)
+
+        results = []
+        workers = [asyncio.create_task(self._worker(queue, session, start, end, results))
+                   for _ in range(min(self.max_concurrency, len(symbols)))]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return results
+
+    async def _worker(self, queue: asyncio.Queue, session: aiohttp.ClientSession, start_date: str, end_date: str, out: list):
+        while True:
+            symbol = await queue.get()
+            try:
+                out.append(await self.fetch_symbol_data(session, symbol, start_date, end_date))
+            except Exception:
+                # Already logged by fetch_symbol_data; the symbol is dropped
+                pass
+            finally:
+                queue.task_done()
+
+    async def _pause(self, seconds: float):
+        # Hold every worker rather than letting each one back off on its own
+        if not self._resume.is_set():
+            await self._resume.wait()
+            return
+        self._resume.clear()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._resume.set()
 
     @retry(stop=stop_after_attempt(5), 
            wait=wait_exponential(multiplier=1, min=4, max=60),
            retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)))
     async def fetch_symbol_data(self, session: aiohttp.ClientSession, symbol: str, start_date: str, end_date: str):
         url = f"{self.base_url}/v2/stocks/bars"
-        headers = {"APCA-API-KEY-ID": self.api_key, "APCA-API-SECRET-KEY": self.api_secret}
         params = {
             "symbols": symbol,
             "timeframe": "1Min",
@@ -34,26 +98,28 @@ class HistoricalDataFetcher:
             "feed": "sip"
         }
         try:
-            async with session.get(url, headers=headers, params=params, timeout=30) as response:
+            await self._resume.wait()
+            async with session.get(url, params=params, timeout=30) as response:
                 if response.status == 429:
-                    logging.warning(f"Rate limit exceeded for {symbol}. Retrying...")
-                    await asyncio.sleep(60)  # Wait for 1 minute before retrying
+                    logging.warning(f"Rate limit exceeded for {symbol}. Pausing requests before retrying...")
+                    retry_after = response.headers.get('Retry-After', '')
+                    await self._pause(int(retry_after) if retry_after.isdigit() else 60)
                     raise aiohttp.ClientError("Rate limit exceeded")
                 response.raise_for_status()
-                data = await response.json()
+                # orjson parses the raw body directly, without decoding it to str first
+                data = orjson.loads(await response.read())
 
                 if "bars" in data and symbol in data["bars"]:
                     bar_list = data["bars"][symbol]
-                    df = pd.DataFrame(bar_list)
-                    df['timestamp'] = pd.to_datetime(df['t']).dt.tz_convert('UTC')
-                    df.set_index('timestamp', inplace=True)
-                    df = df[['c']]
-                    df.columns = ['close']
-                    logging.info(f"Fetched {len(df)} bars for {symbol}")
-                    return symbol, df
+                    # Bar timestamps are RFC-3339 UTC ('Z' suffix); numpy datetime64 is tz-naive UTC
+                    timestamps = np.fromiter((bar['t'].rstrip('Z') for bar in bar_list),
+                                             dtype='datetime64[ns]', count=len(bar_list))
+                    closes = np.fromiter((bar['c'] for bar in bar_list), dtype=PRICE_DTYPE, count=len(bar_list))
+                    logging.info(f"Fetched {len(closes)} bars for {symbol}")
+                    return symbol, timestamps, closes
                 else:
                     logging.warning(f"No data received for {symbol}")
-                    return symbol, pd.DataFrame()
+                    return symbol, np.empty(0, dtype='datetime64[ns]'), np.empty(0, dtype=PRICE_DTYPE)
         except Exception as e:
             logging.error(f"Error fetching data for symbol {symbol}: {str(e)}")
             raise
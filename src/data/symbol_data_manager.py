@@ -3,10 +3,15 @@ import math
 import logging
 import numpy as np
 import pandas as pd
-import pandas_market_calendars as mcal
 from typing import Dict, Set, Callable
 from datetime import datetime, timedelta, date
-from ..core.symbol_data import SymbolData
+from ..core.symbol_data import SymbolData, PRICE_DTYPE
+from ..utils.helpers import get_nyse_calendar
+
+# Codes stored in SymbolDataManager.last_action; NO_ACTION marks a symbol without an alert yet
+NO_ACTION = -1
+ACTION_CODES = {'None': 0, 'Buy': 1, 'Sell': 2}
+ACTION_NAMES = {code: action for action, code in ACTION_CODES.items()}
 
 class SymbolDataManager:
     def __init__(self, symbols: Set[str], ndays: int, calculate_start_date: Callable,
@@ -17,90 +22,104 @@ class SymbolDataManager:
         self.calculate_start_date = calculate_start_date
         self.test_mode = test_mode
         self.days_ago = days_ago
-        self.last_processed_price: Dict[str, float] = {}
         self.current_trading_day = date.today()
-        self.price_trends = {symbol: {'last_action': None, 'extreme_price': None, 'day_high': None, 'day_low': None} for symbol in symbols}
+        # Per-symbol state, one entry per symbol_index position (NaN / NO_ACTION = unset)
+        self.symbol_index: Dict[str, int] = {}
+        self.last_processed_price = np.empty(0, dtype=PRICE_DTYPE)
+        self.extreme_price = np.empty(0, dtype=PRICE_DTYPE)
+        self.day_high = np.empty(0, dtype=PRICE_DTYPE)
+        self.day_low = np.empty(0, dtype=PRICE_DTYPE)
+        self.last_action = np.empty(0, dtype=np.int8)
+        self.means = np.empty(0, dtype=PRICE_DTYPE)
+        self.stds = np.empty(0, dtype=PRICE_DTYPE)
+        self._nyse = get_nyse_calendar()
+        self._valid_days = None
 
     async def initialize_data(self, fetcher):
-        nyse = mcal.get_calendar('NYSE')
         today = datetime.now(pytz.UTC).date()
-        valid_dates = nyse.valid_days(start_date=today - timedelta(days=30), end_date=today)
+        valid_dates = self._nyse.valid_days(start_date=today - timedelta(days=30), end_date=today)
 
         if self.test_mode:
-            end_date = valid_dates[-self.days_ago]
-            start_date = valid_dates[max(-len(valid_dates), -self.ndays - self.days_ago)]
+            end_pos = len(valid_dates) - self.days_ago
+            end_date = valid_dates[end_pos]
+            start_pos = max(0, len(valid_dates) - self.ndays - self.days_ago)
         else:
+            end_pos = len(valid_dates) - 1
             end_date = today
-            start_date = valid_dates[max(-len(valid_dates), -self.ndays)]
+            start_pos = max(0, len(valid_dates) - self.ndays)
+        start_date = valid_dates[start_pos]
+
+        # The trading days of the fetch window, reused by initialize_symbol_data
+        self._valid_days = valid_dates[start_pos:end_pos + 1]
 
         start_datetime = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=pytz.UTC)
         end_datetime = datetime.combine(end_date, datetime.max.time()).replace(tzinfo=pytz.UTC)
 
         historical_data = await fetcher.fetch_historical_data(self.symbols, start_datetime, end_datetime)
-        for symbol, df in historical_data:
-            if not df.empty:
-                self.symbol_data[symbol] = SymbolData(symbol=symbol, historical_data=df)
+        for symbol, timestamps, closes in historical_data:
+            if len(closes):
+                self.symbol_data[symbol] = SymbolData(symbol=symbol, timestamps=timestamps, closes=closes)
 
         self.initialize_symbol_data(start_datetime, end_datetime)
 
     def initialize_symbol_data(self, start_date: datetime, end_date: datetime):
-        nyse = mcal.get_calendar('NYSE')
         symbols_to_remove = set()
         log_data = []
 
+        valid_days = self._valid_days
+        if valid_days is None:
+            valid_days = self._nyse.valid_days(start_date=start_date.date(), end_date=end_date.date())
+        logging.debug(f"Valid trading days: {valid_days}")
+
+        # Ensure the last_valid_day is the day before the current trading day
+        if len(valid_days) > 1:
+            last_valid_day = pd.Timestamp(valid_days[-2]).tz_convert('UTC')
+            # Bar timestamps are sorted UTC datetime64, so the baseline day is a contiguous slice
+            baseline_bounds = np.array([np.datetime64(last_valid_day.date(), 'ns'),
+                                        np.datetime64(last_valid_day.date() + timedelta(days=1), 'ns')])
+        else:
+            last_valid_day = None
+
+        logging.debug(f"Last valid trading day for baseline data: {last_valid_day}")
+
         for symbol, data in self.symbol_data.items():
             logging.debug(f"Initializing data for symbol: {symbol}")
 
-            df = data.historical_data
+            timestamps = data.timestamps
+            closes = data.full_prices
 
-            logging.debug(f"Retrieved {len(df)} rows of historical data for {symbol}")
+            logging.debug(f"Retrieved {len(closes)} rows of historical data for {symbol}")
 
-            if df.empty or len(df) < 2:
+            if len(closes) < 2:
                 logging.warning(f"Insufficient data for {symbol:<6}. Removing from processing list.")
                 symbols_to_remove.add(symbol)
                 continue
 
-            valid_days = nyse.valid_days(start_date=start_date.date(), end_date=end_date.date())
-            logging.debug(f"Valid trading days for symbol {symbol}: {valid_days}")
-
-            # Ensure the last_valid_day is the day before the current trading day
-            if len(valid_days) > 1:
-                last_valid_day = pd.Timestamp(valid_days[-2]).tz_convert('UTC')
-            else:
-                last_valid_day = None
-
-            logging.debug(f"Last valid trading day for baseline data for {symbol}: {last_valid_day}")
-
             if last_valid_day is None:
                 logging.warning(f"No valid trading days found for baseline data for {symbol:<6}. Removing from processing list.")
                 symbols_to_remove.add(symbol)
                 continue
 
-            # Filter the data to include only the baseline period (up to and including last_valid_day)
-            # Drop the time component for comparison
-            df['date'] = df.index.date
-            baseline_data = df[df['date'] == last_valid_day.date()]
-            baseline_prices = baseline_data['close'].values
+            # Filter the data to include only the baseline period (last_valid_day)
+            start, stop = np.searchsorted(timestamps, baseline_bounds)
+            baseline_prices = closes[start:stop]
+            # Timestamps are only needed to locate the baseline day; only the price buffer is kept
+            data.timestamps = None
 
-            logging.debug(f"Baseline data for {symbol} on {last_valid_day.date()}: {baseline_data}")
-            logging.debug(f"Baseline prices for {symbol}: {baseline_prices}")
+            logging.debug(f"Baseline prices for {symbol} on {last_valid_day.date()}: {baseline_prices}")
 
             if len(baseline_prices) < 2:
                 logging.warning(f"Insufficient baseline data for {symbol:<6}. Removing from processing list.")
                 symbols_to_remove.add(symbol)
                 continue
 
-            baseline_mean = np.mean(baseline_prices)
-            baseline_std = np.std(baseline_prices)
+            data.set_baseline(baseline_prices)
+            baseline_mean = data.baseline_mean
+            baseline_std = data.baseline_std
 
             logging.debug(f"Baseline mean for {symbol}: {baseline_mean}")
             logging.debug(f"Baseline std deviation for {symbol}: {baseline_std}")
 
-            data.baseline_prices = baseline_prices
-            data.baseline_mean = baseline_mean
-            data.baseline_std = baseline_std
-            data.full_prices = df['close'].values
-
             logging.debug(f"Updated SymbolData for {symbol} with baseline prices shape: {data.baseline_prices.shape} "
                           f"and full prices shape: {data.full_prices.shape}")
 
@@ -136,6 +155,8 @@ class SymbolDataManager:
             if symbol in self.symbols:
                 self.symbols.remove(symbol)
 
+        self.build_baseline_arrays()
+
         logging.info(f"Removed {len(symbols_to_remove)} symbols due to insufficient or invalid data.")
         logging.info(f"Remaining symbols for processing: {', '.join(sorted(self.symbols))}")
 
@@ -150,30 +171,52 @@ class SymbolDataManager:
                          f"last price: {data['last_price']:>10.3f}, "
                          f"zscore: {data['zscore']:>6.2f}")
 
+    def build_baseline_arrays(self):
+        """
+        Lay out the baseline mean/std of every symbol as parallel arrays so the
+        z-scores of a whole batch of prices can be computed in one vector op,
+        and reset the per-symbol streaming state to match the new index.
+        """
+        symbols = sorted(self.symbol_data)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.means = np.array([self.symbol_data[symbol].baseline_mean for symbol in symbols], dtype=PRICE_DTYPE)
+        self.stds = np.array([self.symbol_data[symbol].baseline_std for symbol in symbols], dtype=PRICE_DTYPE)
+        self.last_processed_price = np.full(len(symbols), np.nan, dtype=PRICE_DTYPE)
+        self.extreme_price = np.full(len(symbols), np.nan, dtype=PRICE_DTYPE)
+        self.day_high = np.full(len(symbols), np.nan, dtype=PRICE_DTYPE)
+        self.day_low = np.full(len(symbols), np.nan, dtype=PRICE_DTYPE)
+        self.last_action = np.full(len(symbols), NO_ACTION, dtype=np.int8)
+
     def get_symbol_data(self, symbol: str) -> SymbolData:
         return self.symbol_data.get(symbol, None)
 
     def update_price_trends(self, symbol: str, current_price: float, action: str):
-        trend_data = self.price_trends[symbol]
-
-        if trend_data['last_action'] == action:
-            if action == 'buy':
-                if trend_data['extreme_price'] is None or current_price < trend_data['extreme_price']:
-                    trend_data['extreme_price'] = current_price
-            elif action == 'sell':
-                if trend_data['extreme_price'] is None or current_price > trend_data['extreme_price']:
-                    trend_data['extreme_price'] = current_price
+        i = self.symbol_index[symbol]
+        action_code = ACTION_CODES.get(action.capitalize(), ACTION_CODES['None'])
+
+        if self.last_action[i] == action_code:
+            # Buys track the lowest price of the run, sells the highest; fmin/fmax skip the NaN of an unset entry
+            if action_code == ACTION_CODES['Buy']:
+                self.extreme_price[i] = np.fmin(self.extreme_price[i], current_price)
+            elif action_code == ACTION_CODES['Sell']:
+                self.extreme_price[i] = np.fmax(self.extreme_price[i], current_price)
         else:
-            trend_data['last_action'] = action
-            trend_data['extreme_price'] = current_price
+            self.last_action[i] = action_code
+            self.extreme_price[i] = current_price
 
-        if trend_data['day_high'] is None or current_price > trend_data['day_high']:
-            trend_data['day_high'] = current_price
-        if trend_data['day_low'] is None or current_price < trend_data['day_low']:
-            trend_data['day_low'] = current_price
+        self.day_high[i] = np.fmax(self.day_high[i], current_price)
+        self.day_low[i] = np.fmin(self.day_low[i], current_price)
 
         logging.debug(f"Updated price trends for {symbol} with action: {action}, "
-                      f"extreme_price: {trend_data['extreme_price']}, "
-                      f"day_high: {trend_data['day_high']}, day_low: {trend_data['day_low']}")
+                      f"extreme_price: {self.extreme_price[i]}, "
+                      f"day_high: {self.day_high[i]}, day_low: {self.day_low[i]}")
+
+    def update_day_range(self, idx: np.ndarray, highs: np.ndarray, lows: np.ndarray = None):
+        """
+        Fold a batch of prices into the day high/low of the symbols at `idx`
+        (symbol_index positions, no duplicates).
+        """
+        self.day_high[idx] = np.fmax(self.day_high[idx], highs)
+        self.day_low[idx] = np.fmin(self.day_low[idx], highs if lows is None else lows)
 
 
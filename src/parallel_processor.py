@@ -1,40 +1,157 @@
 # src/parallel_processor.py
 
+import asyncio
 import multiprocessing as mp
+from multiprocessing import shared_memory
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import List, Dict
 import numpy as np
 from src.processing.zscore_processor import ZScoreProcessor
-from src.core.symbol_data import SymbolData
+from src.core.symbol_data import SymbolData, PRICE_DTYPE
+
+# Per-worker state, populated once by _init_worker
+_worker_state = {}
+
+def _attach_arrays(specs):
+    blocks = {}
+    arrays = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        blocks[name] = shared_memory.SharedMemory(name=shm_name)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)
+    return blocks, arrays
+
+def _init_worker(specs, symbols, timeframes):
+    blocks, arrays = _attach_arrays(specs)
+    symbol_data = []
+    for i, symbol in enumerate(symbols):
+        data = SymbolData(symbol=symbol, timeframe=timeframes[i])
+        data.attach_buffer(arrays['prices'][i], int(arrays['lengths'][i]))
+        symbol_data.append(data)
+
+    _worker_state.update({
+        'blocks': blocks,
+        'arrays': arrays,
+        'symbol_data': symbol_data,
+        'processor': ZScoreProcessor(),
+    })
+
+def _process_indices(args):
+    indices, config, version = args
+    arrays = _worker_state['arrays']
+    processor = _worker_state['processor']
+    # Adopt the parent's config when it has changed; process() then refreshes its thresholds
+    if processor.config_manager.version != version:
+        processor.config_manager.config = config
+        processor.config_manager.version = version
+
+    results = []
+    for i in indices:
+        data = _worker_state['symbol_data'][i]
+        data.baseline_mean = arrays['means'][i]
+        data.baseline_std = arrays['stds'][i]
+        results.append(processor.process(data, arrays['new_prices'][i]))
+    return results
 
 class ParallelProcessor:
-    def __init__(self, num_processes: int, zscore_processor: ZScoreProcessor):
+    def __init__(self, num_processes: int, zscore_processor: ZScoreProcessor, use_processes: bool = False):
+        """
+        Args:
+            num_processes (int): Number of workers.
+            zscore_processor (ZScoreProcessor): Processor used by the thread workers.
+            use_processes (bool, optional): Use a process pool over shared-memory
+                buffers instead of threads. The NumPy/SciPy math releases the GIL,
+                so threads are the default; processes only pay off for workloads
+                dominated by pure-Python code. Defaults to False.
+        """
         self.num_processes = min(num_processes, mp.cpu_count())
         self.zscore_processor = zscore_processor
-        self.pool = mp.Pool(processes=self.num_processes)
-
-    def process_symbols(self, symbol_data_list: List[SymbolData], new_prices: Dict[str, float]) -> List[Dict]:
-        # Split the work into chunks
-        chunks = np.array_split(symbol_data_list, self.num_processes)
-        
-        # Prepare arguments for each process
-        args = [(chunk, new_prices, self.zscore_processor) for chunk in chunks]
-        
-        # Use pool.map to distribute the work
-        results = self.pool.map(self._process_chunk, args)
-        
+        self.use_processes = use_processes
+        self.pool = None if use_processes else ThreadPoolExecutor(max_workers=self.num_processes)
+        self.symbol_index: Dict[str, int] = {}
+        self._blocks = {}
+        self._arrays = {}
+
+    def load_symbols(self, symbol_data: Dict[str, SymbolData]):
+        """
+        Copy the price history and baseline of every symbol into shared memory
+        once and start the worker pool on top of it. Per-tick dispatch then only
+        sends symbol indices; workers read prices from the shared buffers.
+        Thread workers share the SymbolData objects directly, so this is a
+        no-op unless use_processes is set.
+        """
+        if not self.use_processes:
+            return
+
+        self.shutdown()
+
+        symbols = sorted(symbol_data)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+        lengths = np.array([len(symbol_data[symbol].full_prices) for symbol in symbols], dtype=np.int64)
+        # One spare slot per row for the incoming tick
+        width = int(lengths.max(initial=0)) + 1
+
+        specs = {}
+        for name, shape, dtype in (('prices', (len(symbols), width), PRICE_DTYPE),
+                                   ('lengths', (len(symbols),), np.int64),
+                                   ('means', (len(symbols),), PRICE_DTYPE),
+                                   ('stds', (len(symbols),), PRICE_DTYPE),
+                                   ('new_prices', (len(symbols),), PRICE_DTYPE)):
+            size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self._blocks[name] = block
+            self._arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            specs[name] = (block.name, shape, dtype)
+
+        for i, symbol in enumerate(symbols):
+            data = symbol_data[symbol]
+            self._arrays['prices'][i, :lengths[i]] = data.full_prices
+            self._arrays['means'][i] = data.baseline_mean
+            self._arrays['stds'][i] = data.baseline_std
+        self._arrays['lengths'][:] = lengths
+        self._arrays['new_prices'][:] = np.nan
+
+        timeframes = [symbol_data[symbol].timeframe for symbol in symbols]
+        self.pool = ProcessPoolExecutor(max_workers=self.num_processes,
+                                        initializer=_init_worker,
+                                        initargs=(specs, symbols, timeframes))
+
+    async def process_symbols(self, symbol_data_list: List[SymbolData], new_prices: Dict[str, float]) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        if not self.use_processes:
+            return list(await asyncio.gather(*[
+                loop.run_in_executor(self.pool, self.zscore_processor.process, data, new_prices[data.symbol])
+                for data in symbol_data_list if data.symbol in new_prices
+            ]))
+
+        # Publish the new prices to shared memory; workers only get indices
+        new_prices_vec = self._arrays['new_prices']
+        indices = []
+        for data in symbol_data_list:
+            i = self.symbol_index.get(data.symbol)
+            if i is not None and data.symbol in new_prices:
+                new_prices_vec[i] = new_prices[data.symbol]
+                indices.append(i)
+        if not indices:
+            return []
+
+        # Split the work into chunks of symbol indices
+        chunks = [chunk for chunk in np.array_split(np.array(indices), self.num_processes) if len(chunk)]
+        config_manager = self.zscore_processor.config_manager
+        config, version = config_manager.config, config_manager.version
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.pool, _process_indices, (chunk, config, version)) for chunk in chunks
+        ])
+
         # Flatten the results
         return [item for sublist in results for item in sublist]
 
-    @staticmethod
-    def _process_chunk(args):
-        chunk, new_prices, processor = args
-        results = []
-        for symbol_data in chunk:
-            if symbol_data.symbol in new_prices:
-                result = processor.process(symbol_data, new_prices[symbol_data.symbol])
-                results.append(result)
-        return results
-
     def shutdown(self):
-        self.pool.close()
-        self.pool.join()
+        if self.pool:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+        # Drop the array views before closing the blocks they point into
+        self._arrays = {}
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+        self._blocks = {}
@@ -0,0 +1,40 @@
+import numpy as np
+from numba import njit
+
+# nogil: the peak search runs on ParallelProcessor's thread pool workers
+@njit(cache=True, nogil=True)
+def _local_maxima(x, sign):
+    # Same plateau handling as scipy.signal.find_peaks without conditions:
+    # flat peaks report their midpoint, rounded down.
+    midpoints = np.empty(x.shape[0] // 2, dtype=np.int64)
+    m = 0
+    i = 1
+    i_max = x.shape[0] - 1
+    while i < i_max:
+        if sign * x[i - 1] < sign * x[i]:
+            i_ahead = i + 1
+            while i_ahead < i_max and x[i_ahead] == x[i]:
+                i_ahead += 1
+            if sign * x[i_ahead] < sign * x[i]:
+                midpoints[m] = (i + i_ahead - 1) // 2
+                m += 1
+                i = i_ahead
+        i += 1
+    return midpoints[:m]
+
+@njit(cache=True, nogil=True)
+def compute_peaks_troughs(cycle):
+    """Index arrays of the local maxima and minima of `cycle`."""
+    return _local_maxima(cycle, 1.0), _local_maxima(cycle, -1.0)
+
+@njit(cache=True)
+def select_alert_indices(zscores, ztrends, sigma_thresh, trend_thresh):
+    """Indices where |zscore| > sigma_thresh and |ztrend| > trend_thresh (NaN never passes)."""
+    # No fastmath here: it may assume NaN-free input and let a NaN through
+    out = np.empty(zscores.shape[0], dtype=np.int64)
+    m = 0
+    for i in range(zscores.shape[0]):
+        if abs(zscores[i]) > sigma_thresh and abs(ztrends[i]) > trend_thresh:
+            out[m] = i
+            m += 1
+    return out[:m]
@@ -0,0 +1,61 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy.linalg import cholesky_banded, cho_solve_banded
+
+class HPFilterCache:
+    """
+    Hodrick-Prescott filter with cached factorizations.
+
+    The HP trend solves (I + lamb * K'K) trend = x, where K is the second
+    difference operator. That matrix only depends on (len(x), lamb), so its
+    banded Cholesky factor is kept in an LRU cache and every later call with
+    the same length and lambda (e.g. each tick of a symbol, or symbols with
+    the same number of bars) is a single O(N) back-substitution.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._factors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def solve(self, b: np.ndarray, lamb: float) -> np.ndarray:
+        """Solve (I + lamb * K'K) t = b for one right-hand side or a (n, k) stack of them."""
+        if len(b) < 3:
+            return np.array(b, dtype=np.float64)
+        return cho_solve_banded((self.factor(len(b), lamb), False), b, check_finite=False)
+
+    def factor(self, n: int, lamb: float) -> np.ndarray:
+        key = (n, lamb)
+        with self._lock:
+            factor = self._factors.get(key)
+            if factor is not None:
+                self._factors.move_to_end(key)
+                return factor
+
+        factor = cholesky_banded(self._banded_matrix(n, lamb), check_finite=False)
+
+        with self._lock:
+            self._factors[key] = factor
+            if len(self._factors) > self.maxsize:
+                self._factors.popitem(last=False)
+        return factor
+
+    @staticmethod
+    def _banded_matrix(n: int, lamb: float) -> np.ndarray:
+        # Upper banded storage of the pentadiagonal I + lamb * K'K:
+        # row 2 is the diagonal, rows 1 and 0 the first and second superdiagonals.
+        m = n - 2
+        diag = np.zeros(n)
+        diag[:m] += 1.0
+        diag[1:m + 1] += 4.0
+        diag[2:] += 1.0
+        off1 = np.zeros(n - 1)
+        off1[:m] -= 2.0
+        off1[1:m + 1] -= 2.0
+
+        ab = np.zeros((3, n))
+        ab[2] = 1.0 + lamb * diag
+        ab[1, 1:] = lamb * off1
+        ab[0, 2:] = lamb
+        return ab
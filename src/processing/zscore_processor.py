@@ -1,25 +1,37 @@
 import numpy as np
-import pandas as pd
-from typing import Dict
-from scipy.stats import zscore
-from scipy.signal import find_peaks
-from statsmodels.tsa.filters.hp_filter import hpfilter
+from typing import Dict, Optional
 from ..core.data_processor import DataProcessor
-from ..core.symbol_data import SymbolData
+from ..core.symbol_data import SymbolData, PRICE_DTYPE
 from ..utils.config_manager import config_manager
+from ._kernels import compute_peaks_troughs
+from .hp_filter import HPFilterCache
 
 class ZScoreProcessor(DataProcessor):
     def __init__(self):
         self.config_manager = config_manager
+        self.hp_cache = HPFilterCache()
+        self.refresh_thresholds()
+
+    def refresh_thresholds(self):
+        # Snapshot the values read on every tick; process() only re-reads them
+        # when the config manager reports a newer version.
+        snapshot = self.config_manager.snapshot()
+        self._config_version = snapshot.version
+        self._sigma_thresh = snapshot.sigma_thresh
+        self._trend_thresh = snapshot.zscore_trend_thresh
+        self._lambda_multipliers = snapshot.lambda_multiplier
 
     def process(self, data: SymbolData, new_price: float) -> Dict:
+        if self.config_manager.version != self._config_version:
+            self.refresh_thresholds()
+
         if data.baseline_std == 0:
             zscore_value = np.nan
         else:
-            zscore_value = (new_price - data.baseline_mean) / data.baseline_std
+            # In PRICE_DTYPE, the same arithmetic as the batch pre-filters, so they agree on the threshold
+            zscore_value = (PRICE_DTYPE(new_price) - data.baseline_mean) / data.baseline_std
 
-        sigma_thresh = self.config_manager.get('sigma_thresh', 30.0)
-        zscore_trend_thresh = self.config_manager.get('zscore_trend_thresh', 2.0)
+        sigma_thresh = self._sigma_thresh
 
         result = {
             "zscore": zscore_value,
@@ -28,69 +40,133 @@ class ZScoreProcessor(DataProcessor):
         }
 
         if abs(result['zscore']) > sigma_thresh:
-            processed_data = self.process_data(data, new_price)
-            result.update({
-                "symbol": data.symbol,
-                "num_samples": len(data.full_prices),
-                "lambda": processed_data['lambda'],
-                "action": processed_data['action'],
-                "price": processed_data['price'],
-                "current_price": new_price,
-                "samples_ago": processed_data['samples_ago'],
-                "zscore_trend": processed_data['zscore_trend'][-1] if processed_data['zscore_trend'] is not None else None,
-            })
-
-            # Add zscore_trend_alert to the result
-            result["zscore_trend_alert"] = abs(result['zscore_trend']) > zscore_trend_thresh if result['zscore_trend'] is not None else False
+            self.add_alert_fields(result, data, new_price)
+
+        return result
+
+    def add_alert_fields(self, result: Dict, data: SymbolData, new_price: float) -> Dict:
+        """Run the HP filter/peak search for an alerting tick and add its fields to `result`."""
+        processed_data = self.process_data(data, new_price)
+        result.update({
+            "symbol": data.symbol,
+            "num_samples": len(data.full_prices),
+            "lambda": processed_data['lambda'],
+            "action": processed_data['action'],
+            "price": processed_data['price'],
+            "current_price": new_price,
+            "samples_ago": processed_data['samples_ago'],
+            "zscore_trend": processed_data['zscore_trend'][-1] if processed_data['zscore_trend'] is not None else None,
+        })
+
+        # Add zscore_trend_alert to the result
+        result["zscore_trend_alert"] = abs(result['zscore_trend']) > self._trend_thresh if result['zscore_trend'] is not None else False
 
         return result
 
+    def process_batch(self, data: SymbolData, prices) -> Optional[Dict]:
+        """
+        Process a burst of ticks for one symbol.
+
+        The z-scores of the whole batch are computed in one vector op and the
+        HP filter/peak search runs once, for the most recent tick beyond the
+        sigma threshold. Returns None if no tick in the batch crossed it.
+        """
+        if self.config_manager.version != self._config_version:
+            self.refresh_thresholds()
+
+        if data.baseline_std == 0 or len(prices) == 0:
+            return None
+
+        prices = np.asarray(prices, dtype=np.float64)
+        zscores = (prices.astype(PRICE_DTYPE) - data.baseline_mean) / data.baseline_std
+        alerts = np.flatnonzero(np.abs(zscores) > self._sigma_thresh)
+        if len(alerts) == 0:
+            return None
+
+        # The tick already crossed the threshold here; go straight to the heavy path
+        i = alerts[-1]
+        new_price = float(prices[i])
+        result = {"zscore": zscores[i], "alert": True, "latest_price": new_price}
+        return self.add_alert_fields(result, data, new_price)
+
     def process_data(self, data: SymbolData, new_price: float):
-        prices = np.append(data.full_prices, new_price)
+        prices = data.prices_with(new_price)
         num_samples = len(prices)
         
-        lambda_multipliers = self.config_manager.get('lambda_multiplier', {'1Min': 12, '1Day': 0.0436})
-        lambda_multiplier = lambda_multipliers.get(data.timeframe, 12)
+        lambda_multiplier = self._lambda_multipliers.get(data.timeframe, 12)
         
         lamb = round(lambda_multiplier * num_samples)
         
-        df = pd.DataFrame({'c': prices})
-        df['velocity'] = df['c'].diff()
-        df['zscore_velocity'] = zscore(df['velocity'].dropna(), nan_policy='omit')
-        df['trend'], df['cycle'] = hpfilter(df['c'], lamb=lamb)
-        df['zscore_trend'] = zscore(df['trend'].dropna(), nan_policy='omit')
-        
-        cycle = df['cycle'].to_numpy()
-        peaks, _ = find_peaks(cycle)
-        troughs, _ = find_peaks(-cycle)
-        df['peaks'] = pd.Series(df.iloc[peaks]['c'].values, index=df.iloc[peaks].index)
-        df['troughs'] = pd.Series(df.iloc[troughs]['c'].values, index=df.iloc[troughs].index)
+        state = data.hp_state
+        if (state is not None and state['n'] == num_samples and state['lamb'] == lamb
+                and state['last_price'] == new_price):
+            # Same tick price again (common in trade streams): nothing to recompute
+            return state['last_result']
+
+        # The peak kernel is compiled for C-contiguous input, and a strided price
+        # view would mean prices_with stopped handing out a slice of the buffer.
+        assert prices.flags['C_CONTIGUOUS'], "price buffer view must be C-contiguous"
+        cycle, trend = self.hp_components(data, np.ascontiguousarray(prices, dtype=np.float64), lamb)
+        cycle = np.ascontiguousarray(cycle)
+        trend = np.ascontiguousarray(trend)
+        # Deliberately kept from the original, which unpacked hpfilter's (cycle, trend) swapped:
+        # 'zscore_trend' is the z-score of the cycle and the peaks are searched on the trend.
+        # The series is NaN-free, so a plain mean/std pass matches scipy's zscore
+        cycle_std = cycle.std()
+        zscore_trend = (cycle - cycle.mean()) / cycle_std if cycle_std else np.full_like(cycle, np.nan)
         
-        last_action = self.get_last_action(df)
+        peaks, troughs = compute_peaks_troughs(trend)
+        last_action = self.get_last_action(peaks, troughs, prices)
         
-        return {
+        result = {
             'lambda': lamb,
-            'zscore_trend': df['zscore_trend'].values if not df['zscore_trend'].empty else None,
+            'zscore_trend': zscore_trend if len(zscore_trend) else None,
             'action': last_action['type'],
             'price': last_action['price'],
             'samples_ago': last_action['samples_ago']
         }
+        data.hp_state['last_price'] = new_price
+        data.hp_state['last_result'] = result
+        return result
 
-    def get_last_action(self, data):
-        peaks = data['peaks'].dropna()
-        troughs = data['troughs'].dropna()
-        
-        if troughs.empty and peaks.empty:
+    def hp_components(self, data: SymbolData, prices: np.ndarray, lamb: float):
+        """
+        HP filter of the stored prices plus the new tick, as (cycle, trend).
+
+        The filter is linear and only the last sample changes from tick to tick,
+        so the trend is base + new_price * unit: base filters the stored prices
+        with a zero in the tick slot, unit is the response to the tick slot
+        alone. Both are solved once per (length, lamb) and kept on the
+        SymbolData; every tick after that is an O(N) axpy instead of a solve.
+        """
+        n = len(prices)
+        state = data.hp_state
+        if state is None or state['n'] != n or state['lamb'] != lamb:
+            rhs = np.zeros((n, 2))
+            rhs[:-1, 0] = prices[:-1]
+            rhs[-1, 1] = 1.0
+            basis = self.hp_cache.solve(rhs, lamb)
+            state = data.hp_state = {
+                'n': n,
+                'lamb': lamb,
+                'base': np.ascontiguousarray(basis[:, 0]),
+                'unit': np.ascontiguousarray(basis[:, 1]),
+                'last_price': None,
+                'last_result': None,
+            }
+
+        trend = state['base'] + prices[-1] * state['unit']
+        return prices - trend, trend
+
+    def get_last_action(self, peaks_idx: np.ndarray, troughs_idx: np.ndarray, prices: np.ndarray):
+        if len(troughs_idx) == 0 and len(peaks_idx) == 0:
             return {"type": "None", "price": 0.0, "samples_ago": 'N/A'}
         
-        if not peaks.empty and (troughs.empty or peaks.index[-1] > troughs.index[-1]):
-            last_action = peaks.index[-1]
+        if len(peaks_idx) and (len(troughs_idx) == 0 or peaks_idx[-1] > troughs_idx[-1]):
+            last_action = peaks_idx[-1]
             action_type = 'Sell'
         else:
-            last_action = troughs.index[-1]
+            last_action = troughs_idx[-1]
             action_type = 'Buy'
         
-        action_price = data.loc[last_action, 'c']
-        samples_ago = len(data) - data.index.get_loc(last_action) - 1
-        
-        return {"type": action_type, "price": action_price, "samples_ago": samples_ago}
+        return {"type": action_type, "price": prices[last_action], "samples_ago": len(prices) - int(last_action) - 1}
@@ -1,3 +1,4 @@
-# This file can be left empty
-
+from .stream_processor import StreamProcessor
+from .data_stream_manager import DataStreamManager
 
+__all__ = ['StreamProcessor', 'DataStreamManager']
@@ -1,9 +1,11 @@
 # src/streaming/data_stream_manager.py
 
 import logging
+import numpy as np
 from typing import Set, Callable
 from ..core.config import config
 from ..utils.config_manager import config_manager
+from ..core.symbol_data import PRICE_DTYPE
 from ..processing.zscore_processor import ZScoreProcessor
 from .stream_processor import StreamProcessor
 from ..data.symbol_data_manager import SymbolDataManager
@@ -20,7 +22,8 @@ class DataStreamManager:
         calculate_start_date: Callable,
         test_mode: bool = False,
         days_ago: int = 1,
-        stream_type: str = 'trades'
+        stream_type: str = 'trades',
+        flush_interval: float = 0.0
     ):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.fetcher = HistoricalDataFetcher(config.API_KEY, config.API_SECRET, config.BASE_URL)
@@ -31,7 +34,10 @@ class DataStreamManager:
         self.stream_processor = StreamProcessor(
             processor=self.process_data,
             stream_type=stream_type,
-            config_manager=config_manager
+            config_manager=config_manager,
+            batch_processor=self.process_batch,
+            single_processor=self.process_single,
+            flush_interval=flush_interval
         )
         
         self.test_mode = test_mode
@@ -41,6 +47,8 @@ class DataStreamManager:
         try:
             self.logger.info("Initializing data...")
             await self.symbol_manager.initialize_data(self.fetcher)
+            if self.parallel_processor:
+                self.parallel_processor.load_symbols(self.symbol_manager.symbol_data)
             self.logger.info("Data initialization complete.")
             
             if self.test_mode:
@@ -56,20 +64,76 @@ class DataStreamManager:
         finally:
             await self.cleanup()
 
-    def process_data(self, symbol_data_list, new_prices):
+    async def process_data(self, symbol_data_list, new_prices):
+        alert_list = self.select_alerts(symbol_data_list, new_prices)
+        if not alert_list:
+            return []
+
         if self.parallel_processor:
-            return self.parallel_processor.process_symbols(symbol_data_list, new_prices)
+            return await self.parallel_processor.process_symbols(alert_list, new_prices)
         else:
             results = []
-            for symbol_data in symbol_data_list:
-                if symbol_data.symbol in new_prices:
-                    result = self.processor.process(symbol_data, new_prices[symbol_data.symbol])
-                    results.append(result)
+            for symbol_data in alert_list:
+                result = self.processor.process(symbol_data, new_prices[symbol_data.symbol])
+                results.append(result)
             return results
 
+    async def process_single(self, symbol, price):
+        """process_data for a frame with one tick: a scalar z-score against the baseline arrays."""
+        manager = self.symbol_manager
+        i = manager.symbol_index.get(symbol)
+        if i is None:
+            return []
+
+        manager.day_high[i] = np.fmax(manager.day_high[i], price)
+        manager.day_low[i] = np.fmin(manager.day_low[i], price)
+        zscore = (PRICE_DTYPE(price) - manager.means[i]) / manager.stds[i]
+        if not abs(zscore) > config_manager.snapshot().sigma_thresh:
+            return []
+
+        symbol_data = manager.symbol_data[symbol]
+        if self.parallel_processor:
+            return await self.parallel_processor.process_symbols([symbol_data], {symbol: price})
+        return [self.processor.process(symbol_data, price)]
+
+    async def process_batch(self, prices_by_symbol):
+        results = []
+        for symbol, prices in prices_by_symbol.items():
+            symbol_data = self.symbol_manager.symbol_data.get(symbol)
+            if symbol_data is None:
+                continue
+            i = self.symbol_manager.symbol_index.get(symbol)
+            if i is not None and prices:
+                self.symbol_manager.update_day_range(np.array([i]), max(prices), min(prices))
+            result = self.processor.process_batch(symbol_data, prices)
+            if result is not None:
+                results.append(result)
+        return results
+
+    def select_alerts(self, symbol_data_list, new_prices):
+        """
+        Return the symbols whose new price is beyond the sigma threshold, using
+        the manager's baseline arrays so the whole batch is scored at once.
+        The prices are folded into the day high/low on the way.
+        """
+        symbol_index = self.symbol_manager.symbol_index
+        candidates = [symbol_data for symbol_data in symbol_data_list
+                      if symbol_data.symbol in new_prices and symbol_data.symbol in symbol_index]
+        if not candidates:
+            return []
+
+        idx = np.fromiter((symbol_index[sd.symbol] for sd in candidates), dtype=np.intp, count=len(candidates))
+        prices = np.fromiter((new_prices[sd.symbol] for sd in candidates), dtype=PRICE_DTYPE, count=len(candidates))
+        self.symbol_manager.update_day_range(idx, prices)
+        zs = (prices - self.symbol_manager.means[idx]) / self.symbol_manager.stds[idx]
+
+        sigma_thresh = config_manager.snapshot().sigma_thresh
+        return [candidates[i] for i in np.nonzero(np.abs(zs) > sigma_thresh)[0]]
+
     async def cleanup(self):
         self.logger.info("Cleaning up resources...")
         if self.stream_processor.websocket:
             await self.stream_processor.websocket.close()
+        await self.fetcher.close()
         if self.parallel_processor:
             self.parallel_processor.shutdown()
@@ -1,26 +1,72 @@
 # src/streaming/stream_processor.py
 
+import sys
 import logging
 import math
 import asyncio
 import websockets
-import json
+import orjson
+import numpy as np
+from collections import defaultdict
 from ..utils.config_manager import config_manager
+from ..processing._kernels import select_alert_indices
+from ..data.symbol_data_manager import NO_ACTION, ACTION_CODES, ACTION_NAMES
 
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, set):
-            return list(obj)
-        return super().default(obj)
+# Event field names, interned once and shared by the per-event lookups
+_K_T = sys.intern('T')
+_K_S = sys.intern('S')
+_K_P = sys.intern('p')
+_K_C = sys.intern('c')
+_K_H = sys.intern('h')
+_K_L = sys.intern('l')
+
+# Load (or compile) the kernel at import time rather than on the first alert
+select_alert_indices(np.zeros(1), np.zeros(1), 0.0, 0.0)
 
 class StreamProcessor:
-    def __init__(self, processor, stream_type: str, config_manager):
+    # Fixed attribute set: the per-frame paths read these through slots instead of an instance dict
+    __slots__ = ('processor', 'batch_processor', 'single_processor', 'stream_type', 'config_manager',
+                 'flush_interval', 'proxy_url', 'websocket', 'symbol_manager', '_sym_id', '_symbols_payload',
+                 '_pending', '_batches', '_queue', 'dropped_frames', '_expected_type', '_dispatch',
+                 '_cfg_version', '_alert_enabled', '_sigma', '_zt')
+
+    def __init__(self, processor, stream_type: str, config_manager, batch_processor=None, flush_interval: float = 0.0,
+                 single_processor=None):
+        """
+        Args:
+            processor (Callable): Coroutine taking (symbol_data_list, new_prices) for per-tick processing.
+            stream_type (str): 'trades' or 'bars'.
+            config_manager (ConfigManager): Source of the alert thresholds.
+            batch_processor (Callable, optional): Coroutine taking {symbol: [prices]} used when batching.
+            flush_interval (float, optional): Seconds to coalesce ticks per symbol before processing
+                them as one batch. 0 processes every tick as it arrives. Defaults to 0.0.
+            single_processor (Callable, optional): Coroutine taking (symbol, price) used for frames
+                carrying a single tick. Defaults to None, which sends those through processor too.
+        """
         self.processor = processor
+        self.batch_processor = batch_processor
+        self.single_processor = single_processor
         self.stream_type = stream_type
         self.config_manager = config_manager
+        self.flush_interval = flush_interval if batch_processor else 0.0
         self.proxy_url = "ws://localhost:8765"
         self.websocket = None
         self.symbol_manager = None
+        self._sym_id = {}
+        self._symbols_payload = []
+        self._pending = defaultdict(list)
+        self._batches = []
+        # Decoded frames waiting for the worker; the socket keeps filling it while ticks are scored
+        self._queue = asyncio.Queue(maxsize=10_000)
+        self.dropped_frames = 0
+        # The stream type never changes, so pick the event type and handler once
+        self._expected_type = 't' if stream_type == 'trades' else 'b'
+        self._dispatch = self.process_trade if stream_type == 'trades' else self.process_bar
+        self._cfg_version = -1
+        # Alerts log at INFO; when that is off, skip building the messages altogether
+        self._alert_enabled = logging.getLogger().isEnabledFor(logging.INFO)
+        self._sigma = None
+        self._zt = None
 
     async def simulate(self):
         logging.info("Simulation mode is not yet implemented.")
@@ -28,7 +74,8 @@ class StreamProcessor:
 
     async def connect(self):
         try:
-            self.websocket = await websockets.connect(self.proxy_url)
+            # Market-data frames are small JSON; per-message deflate costs more CPU than it saves
+            self.websocket = await websockets.connect(self.proxy_url, compression=None)
             logging.info(f"Connected to proxy server at {self.proxy_url}")
         except Exception as e:
             logging.error(f"Failed to connect to proxy server: {e}")
@@ -41,106 +88,219 @@ class StreamProcessor:
 
         subscribe_message = {
             "action": "subscribe",
-            self.stream_type: list(self.symbol_manager.symbols)
+            self.stream_type: self._symbols_payload
         }
 
         try:
-            await self.websocket.send(json.dumps(subscribe_message, cls=CustomJSONEncoder))
+            # Decoded so the subscription still goes out as a text frame
+            await self.websocket.send(orjson.dumps(subscribe_message).decode())
             logging.info(f"Sent subscription message: {subscribe_message}")
         except Exception as e:
             logging.error(f"Failed to send subscription message: {e}")
             raise
 
-    async def handle_message(self, message: str):
+    def handle_message(self, message: bytes):
+        """Decode one frame and queue it for the worker. Frames are dropped while the queue is full."""
         try:
-            data = json.loads(message)
-            message_type = data.get('T')
-            symbol = data.get('S')
-
-            if message_type and symbol:
-                if self.stream_type == 'trades' and message_type == 't':
-                    await self.process_trade(data)
-                elif self.stream_type == 'bars' and message_type == 'b':
-                    await self.process_bar(data)
-        except json.JSONDecodeError as e:
+            data = orjson.loads(message)
+        except orjson.JSONDecodeError as e:
             logging.error(f"Failed to decode JSON message: {e}")
+            return
+
+        try:
+            self._queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.dropped_frames += 1
+            if self.dropped_frames % 1000 == 1:
+                logging.warning(f"Processing queue full; {self.dropped_frames} frames dropped so far")
+
+    def handle_decoded(self, data):
+        """
+        Dispatch the events of one decoded frame. Returns the {symbol: price}
+        batches to hand to process_data, in arrival order; nothing here awaits.
+        """
+        self._batches = [{}]
+        try:
+            # Alpaca packs several events into one frame as a JSON array; drain
+            # them all and score the frame's ticks together in one processor call.
+            expected_type = self._expected_type
+            dispatch = self._dispatch
+            for item in (data if isinstance(data, list) else (data,)):
+                # Subscripts instead of .get(): events missing a field are skipped via KeyError
+                try:
+                    if item[_K_T] == expected_type and item[_K_S]:
+                        dispatch(item)
+                except KeyError:
+                    continue
         except Exception as e:
             logging.error(f"Error handling message: {e}", exc_info=True)
+        return [batch for batch in self._batches if batch]
 
-    async def process_trade(self, trade_data):
-        symbol = trade_data['S']
-        price = trade_data['p']
-        await self.process_data({symbol: price})
+    def process_trade(self, trade_data):
+        self.add_tick(trade_data[_K_S], trade_data[_K_P])
 
-    async def process_bar(self, bar_data):
-        symbol = bar_data['S']
-        close = bar_data['c']
-        await self.process_data({symbol: close})
+    def process_bar(self, bar_data):
+        # A bar carries its own range; fold it into the day high/low (the close is folded in with the tick)
+        symbol = bar_data[_K_S]
+        close = bar_data[_K_C]
+        high, low = bar_data.get(_K_H), bar_data.get(_K_L)
+        sid = self._sym_id.get(symbol)
+        if sid is not None and high is not None and low is not None:
+            self.symbol_manager.update_day_range(sid, high, low)
+        self.add_tick(symbol, close)
+
+    def add_tick(self, symbol, price):
+        if self.flush_interval:
+            self._pending[symbol].append(price)
+            return
+        # A second tick for the same symbol in one frame must not overwrite the
+        # first, so it starts the next batch.
+        batch = self._batches[-1]
+        if symbol in batch:
+            batch = {}
+            self._batches.append(batch)
+        batch[symbol] = price
 
     async def process_data(self, new_prices):
+        # The one await left per batch: the processor may hand the work to its worker pool
         symbol_data_list = [self.symbol_manager.symbol_data[symbol] for symbol in new_prices if symbol in self.symbol_manager.symbol_data]
         
-        results = self.processor(symbol_data_list, new_prices)
+        results = await self.processor(symbol_data_list, new_prices)
+        self.handle_results(results)
 
-        for result in results:
-            symbol = result['symbol']
-            zscore = result['zscore']
-            zscore_trend = result.get('zscore_trend')
-            
-            sigma_thresh = self.config_manager.get('sigma_thresh', 30.0)
-            zscore_trend_thresh = self.config_manager.get('zscore_trend_thresh', 2.0)
+    async def _worker(self):
+        while True:
+            data = await self._queue.get()
+            try:
+                for new_prices in self.handle_decoded(data):
+                    try:
+                        # Most frames carry one tick: score it without building the batch arrays
+                        if len(new_prices) == 1 and self.single_processor:
+                            (symbol, price), = new_prices.items()
+                            self.handle_results(await self.single_processor(symbol, price))
+                        else:
+                            await self.process_data(new_prices)
+                    except Exception as e:
+                        logging.error(f"Error processing ticks: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, defaultdict(list)
+        results = await self.batch_processor(pending)
+        self.handle_results(results)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"Error processing batched ticks: {e}", exc_info=True)
+
+    def handle_results(self, results):
+        if self.config_manager.version != self._cfg_version:
+            snapshot = self.config_manager.snapshot()
+            self._sigma = snapshot.sigma_thresh
+            self._zt = snapshot.zscore_trend_thresh
+            self._cfg_version = snapshot.version
+        # Only alerting results carry a symbol; drop any other so one cannot sink the whole batch
+        results = [result for result in results if 'symbol' in result]
+        if not results:
+            return
 
-            if abs(zscore) > sigma_thresh and (zscore_trend is None or abs(zscore_trend) > zscore_trend_thresh):
-                self.log_alert(result)
+        n = len(results)
+        zscores = np.fromiter((result['zscore'] for result in results), dtype=np.float64, count=n)
+        # A missing trend z-score never blocks an alert, so it maps to +inf; a NaN one still fails the compare
+        ztrends = np.fromiter((np.inf if result.get('zscore_trend') is None else result['zscore_trend']
+                               for result in results), dtype=np.float64, count=n)
 
-            self.symbol_manager.last_processed_price[symbol] = result['latest_price']
+        sids = np.fromiter((self._sym_id[result['symbol']] for result in results), dtype=np.intp, count=n)
 
-    def log_alert(self, result):
+        for i in select_alert_indices(zscores, ztrends, self._sigma, self._zt):
+            self.log_alert(results[i], sids[i])
+
+        self.symbol_manager.last_processed_price[sids] = [result['latest_price'] for result in results]
+
+    def log_alert(self, result, sid):
         symbol = result['symbol']
-        current_trend = self.symbol_manager.price_trends[symbol]
+        manager = self.symbol_manager
+        action_code = ACTION_CODES[result['action']]
         
-        if current_trend.get('last_action') != result['action']:
-            if current_trend.get('extreme_price') is not None:
+        if manager.last_action[sid] != action_code:
+            if self._alert_enabled and manager.last_action[sid] != NO_ACTION:
                 logging.info(
-                    f"TREND CHANGE: {symbol:<6} | Prev Act: {current_trend['last_action']:<4} | "
-                    f"New Act: {result['action']:<4} | Ext. Price: {current_trend['extreme_price']:>8.3f} | "
-                    f"Day High: {current_trend['day_high']:>8.3f} | Day Low: {current_trend['day_low']:>8.3f}"
+                    "TREND CHANGE: %-6s | Prev Act: %-4s | New Act: %-4s | Ext. Price: %8.3f | "
+                    "Day High: %8.3f | Day Low: %8.3f",
+                    symbol, ACTION_NAMES[manager.last_action[sid]], result['action'], manager.extreme_price[sid],
+                    manager.day_high[sid], manager.day_low[sid]
                 )
 
-            current_trend['extreme_price'] = result['latest_price']
-            current_trend['last_action'] = result['action']
+            manager.extreme_price[sid] = result['latest_price']
+            manager.last_action[sid] = action_code
+
+        # The trend state above is kept up to date either way; only the message is skipped
+        if not self._alert_enabled:
+            return
 
         logging.info(
-            f"ALERT: {symbol:<6} | Price: {result['latest_price']:>8.3f} | "
-            f"Z-Score: {result['zscore']:>5.1f} | Act: {result['action']:<4} | "
-            f"Samples Ago: {result.get('samples_ago', 'N/A'):>4} | "
-            f"Z-Trend: {result.get('zscore_trend', 'N/A'):>5.1f} | "
-            f"Lambda: {result['lambda']:>8} | Ext. Price: {current_trend['extreme_price']:>8.3f}"
+            "ALERT: %-6s | Price: %8.3f | Z-Score: %5.1f | Act: %-4s | Samples Ago: %4s | "
+            "Z-Trend: %5.1f | Lambda: %8s | Ext. Price: %8.3f",
+            symbol, result['latest_price'], result['zscore'], result['action'], result.get('samples_ago', 'N/A'),
+            result.get('zscore_trend', 'N/A'), result['lambda'], manager.extreme_price[sid]
         )
 
     async def listen(self):
         try:
-            async for message in self.websocket:
-                await self.handle_message(message)
-        except websockets.exceptions.ConnectionClosed as e:
-            logging.warning(f"WebSocket connection closed: {e}. Attempting to reconnect...")
-            await self.reconnect()
-        except Exception as e:
-            logging.error(f"Error while listening to WebSocket: {e}", exc_info=True)
-            await self.reconnect()
+            while True:
+                # decode=False returns the raw payload and skips UTF-8 decoding; orjson parses bytes directly
+                message = await self.websocket.recv(decode=False)
+                self.handle_message(message)
+        except websockets.exceptions.ConnectionClosedOK:
+            return
 
     async def reconnect(self):
-        try:
-            await self.connect()
-            await self.subscribe()
-            await self.listen()
-        except Exception as e:
-            logging.error(f"Reconnection failed: {e}. Retrying in 5 seconds...")
-            await asyncio.sleep(5)
-            await self.reconnect()
+        """Connect and subscribe again, backing off exponentially (capped at 60s) between failed attempts."""
+        backoff = 1
+        while True:
+            try:
+                await self.connect()
+                await self.subscribe()
+                return
+            except Exception as e:
+                delay = min(5 * backoff, 60)
+                logging.error(f"Reconnection failed: {e}. Retrying in {delay} seconds...")
+                await asyncio.sleep(delay)
+                backoff *= 2
 
     async def run(self, symbol_manager):
         self.symbol_manager = symbol_manager
-        await self.connect()
-        await self.subscribe()
-        await self.listen()
+        self._sym_id = symbol_manager.symbol_index
+        # Built once and reused by every (re)subscribe; sorted so reconnects send the same payload
+        self._symbols_payload = sorted(symbol_manager.symbols)
+        # The worker outlives reconnects; only run() starts and stops it
+        worker_task = asyncio.create_task(self._worker())
+        flush_task = asyncio.create_task(self._flush_loop()) if self.flush_interval else None
+        try:
+            await self.connect()
+            await self.subscribe()
+            # listen() returns on a clean close and raises on anything else
+            while True:
+                try:
+                    await self.listen()
+                    break
+                except websockets.exceptions.ConnectionClosed as e:
+                    logging.warning(f"WebSocket connection closed: {e}. Attempting to reconnect...")
+                except Exception as e:
+                    logging.error(f"Error while listening to WebSocket: {e}", exc_info=True)
+                await self.reconnect()
+            # The stream ended cleanly: score what is still queued, then the ticks left in the coalescing window
+            await self._queue.join()
+            if flush_task:
+                await self.flush()
+        finally:
+            worker_task.cancel()
+            if flush_task:
+                flush_task.cancel()
@@ -2,18 +2,29 @@
 
 import os
 import json
-import time
 import logging
 from pathlib import Path
-from threading import Thread
+from collections import namedtuple
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+# The settings read on every tick, as one immutable value
+ConfigSnapshot = namedtuple('ConfigSnapshot', ['version', 'sigma_thresh', 'zscore_trend_thresh', 'lambda_multiplier'])
 
 class ConfigManager:
     def __init__(self, config_file='config/config.json'):
         self.config_file = Path(__file__).parent.parent.parent / config_file
         self.config = self.load_config()
         self.last_modified = os.path.getmtime(self.config_file)
-        self.watch_thread = Thread(target=self.watch_config, daemon=True)
-        self.watch_thread.start()
+        # Bumped on every change to self.config; readers cache values against it
+        self.version = 0
+        self._snapshot = None
+        # inotify/FSEvents wake the observer only on real changes; the parent
+        # directory is watched so editors that replace the file are caught too
+        self.observer = Observer()
+        self.observer.schedule(ConfigFileHandler(self), str(self.config_file.parent), recursive=False)
+        self.observer.daemon = True
+        self.observer.start()
 
     def load_config(self):
         try:
@@ -32,6 +43,18 @@ class ConfigManager:
     def get(self, key, default=None):
         return self.config.get(key, default)
 
+    def snapshot(self) -> ConfigSnapshot:
+        """The hot-path settings for the current version; rebuilt only after a change."""
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.version != self.version:
+            snapshot = self._snapshot = ConfigSnapshot(
+                version=self.version,
+                sigma_thresh=self.get('sigma_thresh', 30.0),
+                zscore_trend_thresh=self.get('zscore_trend_thresh', 2.0),
+                lambda_multiplier=self.get('lambda_multiplier', {'1Min': 12, '1Day': 0.0436}),
+            )
+        return snapshot
+
     def update(self, key, value):
         """
         Update a configuration key with a new value.
@@ -41,28 +64,40 @@ class ConfigManager:
             value (Any): The new value to assign to the key.
         """
         self.config[key] = value
+        self.version += 1
+        tmp_file = self.config_file.with_name(self.config_file.name + '.tmp')
         try:
-            with open(self.config_file, 'w') as f:
+            with open(tmp_file, 'w') as f:
                 json.dump(self.config, f, indent=2)
+            # The rename keeps the temp file's mtime; record it first so the
+            # watcher sees our own write as already loaded, and never a half-written file
+            self.last_modified = os.path.getmtime(tmp_file)
+            os.replace(tmp_file, self.config_file)
             logging.info(f"Configuration updated: {key} = {value}")
-            self.last_modified = os.path.getmtime(self.config_file)
         except Exception as e:
             logging.error(f"Failed to update configuration: {e}")
 
-    def watch_config(self):
-        while True:
-            time.sleep(1)  # Check every second
-            try:
-                current_mtime = os.path.getmtime(self.config_file)
-                if current_mtime > self.last_modified:
-                    old_config = self.config.copy()
-                    self.config = self.load_config()
-                    self.last_modified = current_mtime
-                    self.log_changes(old_config, self.config)
-            except FileNotFoundError:
-                logging.error(f"Configuration file not found: {self.config_file}")
-            except Exception as e:
-                logging.error(f"Error watching config file: {e}", exc_info=True)
+    def reload_config(self):
+        try:
+            current_mtime = os.path.getmtime(self.config_file)
+            # Our own update() already holds the written config (its mtime is recorded before the rename)
+            if current_mtime > self.last_modified:
+                # A save that truncates before writing fires an event on the empty
+                # file; keep the current config and pick up the write's own event.
+                if os.path.getsize(self.config_file) == 0:
+                    return
+                new_config = self.load_config()
+                if not new_config:
+                    return
+                old_config = self.config.copy()
+                self.config = new_config
+                self.version += 1
+                self.last_modified = current_mtime
+                self.log_changes(old_config, self.config)
+        except FileNotFoundError:
+            logging.error(f"Configuration file not found: {self.config_file}")
+        except Exception as e:
+            logging.error(f"Error watching config file: {e}", exc_info=True)
 
     def log_changes(self, old_config, new_config):
         for key in new_config:
@@ -76,5 +111,17 @@ class ConfigManager:
                 else:
                     logging.info(f"Configuration updated: {key}")
 
+class ConfigFileHandler(FileSystemEventHandler):
+    def __init__(self, config_manager):
+        self.config_manager = config_manager
+
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'modified', 'moved'):
+            return
+        # A replace-by-rename shows up as a move onto the config file
+        path = getattr(event, 'dest_path', '') or event.src_path
+        if Path(os.fsdecode(path)) == self.config_manager.config_file:
+            self.config_manager.reload_config()
+
 # Instantiate a single ConfigManager instance to be used across the application
 config_manager = ConfigManager()
@@ -1,15 +1,23 @@
 import logging
 import pandas as pd
 import pandas_market_calendars as mcal
+from functools import lru_cache
 from typing import Set
 from pytz import timezone
 from datetime import datetime
 
+@lru_cache(maxsize=None)
+def get_nyse_calendar():
+    # Building a market calendar is not cheap; share one per process
+    return mcal.get_calendar("NYSE")
+
 def read_symbols_from_file(file_path: str) -> Set[str]:
     try:
-        with open(file_path, 'r') as f:
-            return set(symbol.strip().upper() for symbol in f.readlines() if symbol.strip())
-    except IOError as e:
+        # One binary read and split; utf-8-sig also drops the BOM some spreadsheet exports add
+        with open(file_path, 'rb') as f:
+            data = f.read().decode('utf-8-sig')
+        return {symbol.strip().upper() for symbol in data.splitlines() if symbol.strip()}
+    except (IOError, UnicodeDecodeError) as e:
         logging.error(f"Error reading file {file_path}: {e}")
         return set()
 
@@ -28,21 +36,25 @@ def get_symbols(file_path: str = None, symbol_list: str = None) -> Set[str]:
     return symbols
 
 def calculate_start_date(ndays):
-    nyse = mcal.get_calendar("NYSE")
     end_date = (
         pd.Timestamp.now(tz=timezone("America/New_York"))
         .floor("D")
         .tz_localize(None)
     )
-    start_date = pd.Timestamp("2000-01-01")
-    valid_days = nyse.valid_days(start_date=start_date, end_date=end_date)
+    calculated_start_date = _start_date_for(ndays, end_date)
+    print(f"Start Date: {calculated_start_date.strftime('%Y-%m-%d')}")
+    return calculated_start_date
+
+@lru_cache(maxsize=64)
+def _start_date_for(ndays, end_date):
+    # A year has ~252 trading days, so twice the calendar span plus a month of
+    # slack always holds ndays of them; no need to scan back to 2000.
+    earliest = pd.Timestamp("2000-01-01")
+    start_date = end_date - pd.Timedelta(days=min(ndays * 2 + 30, (end_date - earliest).days))
+    valid_days = get_nyse_calendar().valid_days(start_date=start_date, end_date=end_date)
 
     if len(valid_days) < ndays:
         raise ValueError(
             f"Not enough trading days available. Requested: {ndays}, Available: {len(valid_days)}"
         )
-    calculated_start_date = valid_days[-ndays]
-    print(f"Start Date: {calculated_start_date.strftime('%Y-%m-%d')}")
-    return calculated_start_date
-
-
+    return valid_days[-ndays]
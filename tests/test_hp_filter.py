@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from src.core.symbol_data import SymbolData
+from src.processing.hp_filter import HPFilterCache
+from src.processing.zscore_processor import ZScoreProcessor
+
+
+def dense_hp_solve(b, lamb):
+    n = len(b)
+    K = np.zeros((n - 2, n))
+    for i in range(n - 2):
+        K[i, i:i + 3] = (1.0, -2.0, 1.0)
+    return np.linalg.solve(np.eye(n) + lamb * K.T @ K, b)
+
+
+def random_walk(n, seed):
+    rng = np.random.default_rng(seed)
+    return 100.0 + np.cumsum(rng.normal(0.0, 0.1, n))
+
+
+@pytest.mark.parametrize("n,lamb", [(3, 1.0), (10, 1600.0), (200, 2400.0), (390, 12 * 390.0)])
+def test_solve_matches_dense(n, lamb):
+    b = random_walk(n, seed=n)
+    expected = dense_hp_solve(b, lamb)
+    np.testing.assert_allclose(HPFilterCache().solve(b, lamb), expected, rtol=0, atol=1e-8 * np.abs(b).max())
+
+
+def test_solve_stacked_rhs():
+    b = np.column_stack([random_walk(120, seed=1), random_walk(120, seed=2)])
+    cache = HPFilterCache()
+    solved = cache.solve(b, 1440.0)
+    for k in range(b.shape[1]):
+        np.testing.assert_allclose(solved[:, k], dense_hp_solve(b[:, k], 1440.0), atol=1e-8 * np.abs(b).max())
+
+
+def test_factor_is_cached():
+    cache = HPFilterCache(maxsize=2)
+    first = cache.factor(50, 100.0)
+    assert cache.factor(50, 100.0) is first
+    cache.factor(60, 100.0)
+    cache.factor(70, 100.0)
+    assert (50, 100.0) not in cache._factors
+
+
+def test_hp_components_matches_full_solve():
+    processor = ZScoreProcessor()
+    data = SymbolData(symbol="TEST", closes=random_walk(300, seed=3))
+    lamb = 12 * 301
+
+    # The first tick solves the basis, the later ones reuse it
+    for price in (data.full_prices[-1] + 0.5, data.full_prices[-1] - 1.25, 95.0):
+        prices = np.ascontiguousarray(data.prices_with(price), dtype=np.float64)
+        cycle, trend = processor.hp_components(data, prices, lamb)
+        expected = dense_hp_solve(prices, lamb)
+        np.testing.assert_allclose(trend, expected, rtol=0, atol=1e-8 * np.abs(prices).max())
+        np.testing.assert_allclose(cycle, prices - expected, rtol=0, atol=1e-8 * np.abs(prices).max())
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from scipy.signal import find_peaks
+from src.processing._kernels import compute_peaks_troughs
+
+
+def plateau_series(n, seed):
+    # Few distinct levels so flat runs, flat peaks and flat edges are common
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 4, n).astype(np.float64)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_peaks_troughs_match_find_peaks(seed):
+    x = plateau_series(1 + seed % 40, seed)
+    peaks, troughs = compute_peaks_troughs(x)
+    np.testing.assert_array_equal(peaks, find_peaks(x)[0])
+    np.testing.assert_array_equal(troughs, find_peaks(-x)[0])
+
+
+@pytest.mark.parametrize("x", [
+    [1.0, 2.0, 2.0, 2.0, 1.0],
+    [1.0, 2.0, 2.0, 1.0],
+    [1.0, 2.0, 2.0],
+    [3.0, 1.0, 1.0, 3.0],
+    [0.0, 0.0, 0.0],
+    [],
+])
+def test_peaks_troughs_plateaus(x):
+    x = np.array(x, dtype=np.float64)
+    peaks, troughs = compute_peaks_troughs(x)
+    np.testing.assert_array_equal(peaks, find_peaks(x)[0])
+    np.testing.assert_array_equal(troughs, find_peaks(-x)[0])
+
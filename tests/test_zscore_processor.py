@@ -0,0 +1,34 @@
+import numpy as np
+from src.core.symbol_data import SymbolData, PRICE_DTYPE
+from src.processing.zscore_processor import ZScoreProcessor
+
+
+def make_symbol(seed=1):
+    rng = np.random.default_rng(seed)
+    data = SymbolData(symbol="AAA", closes=100.0 + np.cumsum(rng.normal(0.0, 0.05, 500)))
+    data.set_baseline(data.full_prices[-390:])
+    return data
+
+
+def test_process_batch_near_threshold_agrees_with_process():
+    # Prices around mean + sigma * std, where float64 and float32 z-scores can disagree
+    processor = ZScoreProcessor()
+    data = make_symbol()
+    edge = float(data.baseline_mean) + processor._sigma_thresh * float(data.baseline_std)
+    for price in edge + 1e-7 * np.arange(-2000, 2000):
+        result = processor.process_batch(data, [price])
+        assert (result is not None) == bool(processor.process(data, price)['alert'])
+        if result is not None:
+            assert result['symbol'] == "AAA"
+
+
+def test_process_batch_reports_last_alerting_tick():
+    processor = ZScoreProcessor()
+    data = make_symbol()
+    far = float(data.baseline_mean) + 10 * processor._sigma_thresh * float(data.baseline_std)
+    result = processor.process_batch(data, [float(data.baseline_mean), far, float(data.baseline_mean)])
+    expected = processor.process(data, far)
+    assert result['latest_price'] == far
+    assert result['zscore'] == expected['zscore']
+    assert result['action'] == expected['action']
+    assert isinstance(result['zscore'], PRICE_DTYPE)